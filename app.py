@@ -1,36 +1,114 @@
+import functools
+import os
 import pickle as pickle
 
-from dash import dcc, Input, html, Output, State
+from dash import ALL, ClientsideFunction, dcc, Input, html, MATCH, Output, State
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-from dash_extensions.enrich import DashProxy, ServersideOutput, ServersideOutputTransform
+from dash_extensions.enrich import DashProxy
+from flask_caching import Cache
 import numpy as np
+import pyarrow.parquet as pq
 
-import plots
+# plots pulls in plotly (and pandas) transitively, which dominates cold-boot time for each worker. Import it
+# lazily on first use instead of at module load.
+_plots = None
+
+
+def get_plots():
+    """
+    Imports the plots module on first use and caches it.
+    """
+
+    global _plots
+    if _plots is None:
+        # Dash serializes callback output through plotly's JSON machinery, which picks up orjson (in
+        # requirements) automatically. Pin the engine explicitly so figure serialization always takes orjson's
+        # numpy fast path rather than the stdlib encoder.
+        import plotly.io as pio
+        pio.json.config.default_engine = 'orjson'
+        import plots as _plots
+    return _plots
 
 
 # Initialize app and server
 app = DashProxy(
     external_stylesheets=[dbc.themes.SLATE],
     title='Unofficial F1 Viz',
-    suppress_callback_exceptions=True,
-    transforms=[ServersideOutputTransform()]
+    suppress_callback_exceptions=True
 )
 
 server = app.server
 
-# Drop-down list info
+# Cache for fully-built figure dicts. Figures are pure functions of their selection key, so warm hits skip both
+# the pandas work and plotly Figure construction/serialization.
+cache = Cache(server, config={
+    'CACHE_TYPE': 'FileSystemCache',
+    'CACHE_DIR': '/tmp/f1viz-figure-cache',
+    'CACHE_DEFAULT_TIMEOUT': 0
+})
+
+# Drop-down list info. Reading the file into memory and unpickling from bytes is faster than streaming
+# pickle.load for numpy-backed payloads.
 with open('data/drop_down_data.pickle', 'rb') as handle:
-    DROP_DOWN_DATA = pickle.load(handle)
+    DROP_DOWN_DATA = pickle.loads(handle.read())
+# Key views into DROP_DOWN_DATA never change at runtime, so cache them as tuples at import instead of
+# re-listing (and re-sorting) them inside callbacks
+GPS_BY_YEAR = {year: tuple(DROP_DOWN_DATA[year]) for year in DROP_DOWN_DATA}
+SESSIONS_BY_GP = {
+    (year, gp): tuple(DROP_DOWN_DATA[year][gp]) for year in DROP_DOWN_DATA for gp in DROP_DOWN_DATA[year]
+}
+# Whether each GP has lap-view data, precomputed so render_tab_content is a single dict lookup
+HAS_RACE_OR_SPRINT = {
+    key: bool({'Race', 'Sprint'}.intersection(sessions)) for key, sessions in SESSIONS_BY_GP.items()
+}
+
 DEFAULT_YEAR = list(DROP_DOWN_DATA.keys())[0]
-DEFAULT_GPS = sorted(list(DROP_DOWN_DATA[DEFAULT_YEAR].keys()))
+DEFAULT_GPS = sorted(GPS_BY_YEAR[DEFAULT_YEAR])
 DEFAULT_GP = 'Azerbaijan'
 TEL_PARAMS = ['Gear', 'Speed', 'Brake', 'Throttle']
 
+# JSON-friendly copy of the dropdown tree. It is shipped to the browser once via a dcc.Store so the dropdown
+# update callbacks can run clientside (see assets/dropdowns.js) without a server round-trip. The minimum lap is
+# precomputed per driver so the clientside fallback doesn't rescan the lap list on every update.
+DROP_DOWN_TREE = {
+    year: {
+        gp: {
+            session: {
+                driver: {'laps': np.asarray(laps).tolist(), 'minLap': float(np.nanmin(laps))}
+                for driver, laps in drivers.items()
+            }
+            for session, drivers in sessions.items()
+        }
+        for gp, sessions in gps.items()
+    }
+    for year, gps in DROP_DOWN_DATA.items()
+}
+
+# Placeholder figure shown while data loads. A plain dict (colors match plots.get_blank_fig) so building a tab
+# layout doesn't construct and serialize a fresh plotly Figure per graph - or import plotly at all.
+BLANK_FIG = {
+    'data': [],
+    'layout': {
+        'plot_bgcolor': '#272b30',
+        'paper_bgcolor': '#272b30',
+        'font': {'color': 'white'},
+        'xaxis': {'showgrid': False, 'showticklabels': False, 'zeroline': False},
+        'yaxis': {'showgrid': False, 'showticklabels': False, 'zeroline': False}
+    }
+}
+
+# Columns actually used by the visualizations. Reading only these from the parquet files keeps the bytes loaded
+# (and the serverside cache footprint) to a minimum.
+LAP_COLUMNS = ['Driver', 'LapNumber', 'LapTime', 'Position', 'DeltaWinner', 'PitStop', 'Stint', 'Compound',
+               'Yellow', 'Red', 'Safety', 'Virtual', 'Nominal']
+TELEMETRY_COLUMNS = ['Driver', 'X', 'Y', 'Speed', 'nGear', 'Throttle', 'Brake', 'Distance', 'LapNumber']
+
 # App layout
 app.layout = dbc.Container(
     [
-        dcc.Store(id='lap-data', storage_type='memory'),
-        dcc.Store(id='tel-data', storage_type='memory'),
+        dcc.Store(id='drop-down-store', storage_type='memory', data=DROP_DOWN_TREE),
+        dcc.Store(id='last-rendered', storage_type='memory'),
         html.Hr(),
         dcc.Markdown('''To get started, select a year and GP. Then navigate to one of the tabs below.'''),
         dbc.Row(
@@ -103,13 +181,19 @@ def build_welcome_tab():
     )
 
 
+# The welcome tab has no inputs, so build it once at import
+WELCOME_TAB = build_welcome_tab()
+
+
+@functools.lru_cache(maxsize=32)
 def build_lap_tab(year, grand_prix):
-    """Builds the tab that shows lap summaries (delta, tyre strategy, lap times)."""
+    """
+    Builds the tab that shows lap summaries (delta, tyre strategy, lap times). The output depends only on the
+    year and GP, so it is memoized and the component tree is reused across requests.
+    """
 
     # Get options and default values for dropdowns; exclude quali data if it exists
-    sessions = list(DROP_DOWN_DATA[year][grand_prix].keys())
-    if 'Qualifying' in sessions:
-        sessions.remove('Qualifying')
+    sessions = [x for x in SESSIONS_BY_GP[(year, grand_prix)] if x != 'Qualifying']
     session = sessions[0]
 
     # delta_fig = plots.get_delta_viz(year, laps)
@@ -160,7 +244,7 @@ def build_lap_tab(year, grand_prix):
             dbc.Col(
                 [
                     dcc.Loading(
-                        children=[dcc.Graph(id='delta-viz', figure=plots.get_blank_fig())],
+                        children=[dcc.Graph(id='delta-viz', figure=BLANK_FIG)],
                         type='circle'
                     )
                 ],
@@ -177,7 +261,7 @@ def build_lap_tab(year, grand_prix):
             dbc.Col(
                 [
                     dcc.Loading(
-                        children=[dcc.Graph(id='tyre-strategy-viz', figure=plots.get_blank_fig())],
+                        children=[dcc.Graph(id='tyre-strategy-viz', figure=BLANK_FIG)],
                         type='circle'
                     )
                 ],
@@ -194,7 +278,7 @@ def build_lap_tab(year, grand_prix):
             dbc.Col(
                 [
                     dcc.Loading(
-                        children=[dcc.Graph(id='lap-time-viz', figure=plots.get_blank_fig())],
+                        children=[dcc.Graph(id='lap-time-viz', figure=BLANK_FIG)],
                         type='circle'
                     )
                 ],
@@ -209,13 +293,15 @@ def build_lap_tab(year, grand_prix):
     return content
 
 
+@functools.lru_cache(maxsize=32)
 def build_tel_tab(year, grand_prix):
     """
-    Builds the map view visualization tab.
+    Builds the map view visualization tab. Memoized like build_lap_tab since the output depends only on the year
+    and GP.
     """
 
     # Get options and default values for dropdowns
-    sessions = list(DROP_DOWN_DATA[year][grand_prix].keys())
+    sessions = SESSIONS_BY_GP[(year, grand_prix)]
     session = sessions[0]
     tel_param = TEL_PARAMS[0]
 
@@ -232,54 +318,61 @@ def build_tel_tab(year, grand_prix):
         You can have 1 point selected per map at a time.
     """
 
-    content = [
-        dcc.Markdown(summary_text),
-        html.Br(),
-        dbc.Row(
+    # The two selection/map columns are identical apart from their index, which the pattern-matching callbacks
+    # key off of
+    selector_cols = [
+        dbc.Col(
             [
-                dbc.Col(
-                    [
-                        html.P("Select session, driver, lap, and parameter:"),
-                        dcc.Dropdown(
-                            id='tel-session-1',
-                            multi=False,
-                            value=session,
-                            options=[{'label': x, 'value': x} for x in sessions],
-                            clearable=False
-                        ),
-                        html.Br(),
-                        dcc.Dropdown(id='tel-driver-1', multi=False, clearable=False),
-                        html.Br(),
-                        dcc.Dropdown(id='tel-lap-1', multi=False, clearable=False)
-                    ],
-                    xs=12, sm=12, md=12, lg=6, xl=6
+                html.P("Select session, driver, lap, and parameter:"),
+                dcc.Dropdown(
+                    id={'type': 'tel-session', 'i': i},
+                    multi=False,
+                    value=session,
+                    options=[{'label': x, 'value': x} for x in sessions],
+                    clearable=False
                 ),
-                dbc.Col(
-                    [
-                        html.P("Select session, driver, lap, and parameter:"),
-                        dcc.Dropdown(
-                            id='tel-session-2',
-                            multi=False,
-                            value=session,
-                            options=[{'label': x, 'value': x} for x in sessions],
-                            clearable=False
-                        ),
-                        html.Br(),
-                        dcc.Dropdown(id='tel-driver-2', multi=False, clearable=False),
-                        html.Br(),
-                        dcc.Dropdown(id='tel-lap-2', multi=False, clearable=False)
-                    ],
-                    xs=12, sm=12, md=12, lg=6, xl=6
+                html.Br(),
+                dcc.Dropdown(id={'type': 'tel-driver', 'i': i}, multi=False, clearable=False),
+                html.Br(),
+                dcc.Dropdown(id={'type': 'tel-lap', 'i': i}, multi=False, clearable=False)
+            ],
+            xs=12, sm=12, md=12, lg=6, xl=6
+        )
+        for i in (1, 2)
+    ]
+
+    map_cols = [
+        dbc.Col(
+            [
+                html.P("Select parameter to view on map:"),
+                dcc.Dropdown(
+                    id={'type': 'tel-param', 'i': i},
+                    multi=False,
+                    value=tel_param,
+                    options=[{'label': x, 'value': x} for x in TEL_PARAMS],
+                    clearable=False
+                ),
+                dcc.Loading(
+                    children=[dcc.Graph(id={'type': 'tel-map', 'i': i}, figure=BLANK_FIG)],
+                    type='circle'
                 )
-            ]
-        ),
+            ],
+            xs=12, sm=12, md=12, lg=6, xl=6
+        )
+        for i in (1, 2)
+    ]
+
+    content = [
+        dcc.Markdown(summary_text),
+        html.Br(),
+        dbc.Row(selector_cols),
         html.Br(),
         dbc.Row(
             [
                 dbc.Col(
                     [
                         dcc.Loading(
-                            children=[dcc.Graph(id='tel-line-graph', figure=plots.get_blank_fig())],
+                            children=[dcc.Graph(id='tel-line-graph', figure=BLANK_FIG)],
                             type='circle'
                         )
                     ],
@@ -292,268 +385,232 @@ def build_tel_tab(year, grand_prix):
         html.Br(),
         dcc.Markdown(map_header),
         html.Br(),
-        dbc.Row(
-            [
-                dbc.Col(
-                    [
-                        html.P("Select parameter to view on map:"),
-                        dcc.Dropdown(
-                            id='tel-param-1',
-                            multi=False,
-                            value=tel_param,
-                            options=[{'label': x, 'value': x} for x in TEL_PARAMS],
-                            clearable=False
-                        ),
-                        dcc.Loading(children=[dcc.Graph(id='tel-map-1', figure=plots.get_blank_fig())], type='circle')
-                    ],
-                    xs=12, sm=12, md=12, lg=6, xl=6
-                ),
-                dbc.Col(
-                    [
-                        html.P("Select parameter to view on map:"),
-                        dcc.Dropdown(
-                            id='tel-param-2',
-                            multi=False,
-                            value=tel_param,
-                            options=[{'label': x, 'value': x} for x in TEL_PARAMS],
-                            clearable=False
-                        ),
-                        dcc.Loading(children=[dcc.Graph(id='tel-map-2', figure=plots.get_blank_fig())], type='circle')
-                    ],
-                    xs=12, sm=12, md=12, lg=6, xl=6
-                )
-            ]
-        )
+        dbc.Row(map_cols)
     ]
 
     return content
 
 
-def get_driver_list(session, year, grand_prix, driver):
+def filter_lap_telemetry(telemetry, driver, lap_number):
     """
-    Gets the driver list for the selected year, Grand Prix, driver, and session.
+    Returns the telemetry rows for one driver/lap combination as a contiguous slice. Session telemetry is indexed
+    by a sorted (driver, lap) MultiIndex at load time, so the block is one index lookup instead of a boolean mask
+    over the full ~100k-row session frame. The list-wrapped key keeps the result a DataFrame even for single-row
+    laps.
     """
 
-    drivers = list(DROP_DOWN_DATA[year][grand_prix][session.capitalize()].keys())
-    if driver not in drivers:
-        driver_val = drivers[0]
-    else:
-        driver_val = driver
+    try:
+        return telemetry.loc[[(driver, lap_number)]]
+    except KeyError:
+        return telemetry.iloc[:0]
 
-    return [{'label': x, 'value': x} for x in drivers], driver_val
 
+def to_fig_dict(fig):
+    """
+    Converts a Figure to its plain dict form. Dash serializes dicts as-is, and dicts are what the figure cache
+    stores.
+    """
+
+    return fig.to_plotly_json() if hasattr(fig, 'to_plotly_json') else fig
 
-def get_laps_list(driver, year, grand_prix, session, lap):
+
+def render_map(lap, param, session, driver, year, grand_prix, distance):
     """
-    Gets the lap options for the selected year, Grand Prix, driver, and session.
+    Builds a map view figure for one driver/lap selection. The telemetry is sliced to the selected lap here so the
+    plotting code only ever touches single-lap data.
     """
 
+    plots = get_plots()
+
     # Error handling checks that there is data for the user's selections (just in case....)
     try:
-        laps = DROP_DOWN_DATA[year][grand_prix][session.capitalize()][driver]
+        session_data = load_session_data(year, grand_prix, session)
+        telemetry_lap = filter_lap_telemetry(session_data['telemetry'], driver, lap)
+        fastest_lap_num = session_data['fastest'][driver]
     except Exception as err:
-        lap_options = [{'label': 'No Lap Data', 'value': 'No Lap Data'}]
-        lap_value = lap_options[0]['value']
-        print(f"Map view 1 has unexpected {err=}, {type(err)=}")
+        fig = plots.get_no_race_data_fig()
+        print(f"Map view has unexpected {err=}, {type(err)=}")
     else:
-        lap_options = [{'label': x, 'value': x} for x in laps]
-        if lap in laps:
-            lap_value = lap
-        else:
-            lap_value = np.nanmin(laps)
+        fig = plots.get_map_view(driver, param, lap, telemetry_lap, session, distance, fastest_lap_num)
 
-    return lap_options, lap_value
+    return fig
 
 
-@app.callback(
+# Dropdown updates are plain lookups into the dropdown tree, so they run clientside (see assets/dropdowns.js)
+# to avoid a server round-trip per selection change
+app.clientside_callback(
+    ClientsideFunction(namespace='dropdowns', function_name='updateGpOptions'),
     Output('grand-prix', 'options'),
     Output('grand-prix', 'value'),
     Input('year', 'value'),
+    State('drop-down-store', 'data'),
     State('grand-prix', 'value')
 )
-def update_gp_options(year, grand_prix):
-    """
-    Updates the Grand Prix options for a selected year.
-    """
-
-    # Error handling checks that there is data for the user's selections (just in case....)
-    try:
-        gps = list(DROP_DOWN_DATA[year].keys())
-    except Exception as err:
-        gp_options = [{'label': 'No GP Data', 'value': 'No GP Data'}]
-        gp_value = gp_options[0]['value']
-        print(f"Map view 1 has unexpected {err=}, {type(err)=}")
-    else:
-        gp_options = [{'label': x, 'value': x} for x in gps]
-        if grand_prix in gps:
-            gp_value = grand_prix
-        else:
-            gp_value = gps[0]
-
-    return gp_options, gp_value
 
 
-@app.callback(
-    ServersideOutput('tel-data', 'data', session_check=False),
-    ServersideOutput('lap-data', 'data', session_check=False),
-    Input('grand-prix', 'value'),
-    State('year', 'value'),
-    memoize=True
-)
-def store_gp_data(grand_prix, year):
+def get_fastest_laps(laps):
     """
-    Loads and stores (w/ serverside caching) the relevant grand prix's data.
+    Returns a dict of driver -> fastest lap number for one session's lap data. Used as a fallback for data ingested
+    before fastest laps were precomputed. Works on flat numpy arrays (per-driver minimum via scatter, then one
+    vectorized lookup of the matching lap numbers) rather than a pandas groupby.
     """
 
-    filename = 'data/' + year + '/' + grand_prix.replace(' ', '_') + '.pickle'
+    codes, drivers = laps['Driver'].factorize()
+    lap_times = laps['LapTime'].dt.total_seconds().to_numpy()
+    lap_numbers = laps['LapNumber'].to_numpy()
 
-    with open(filename, 'rb') as handle:
-        gp_data = pickle.load(handle)
+    best_times = np.full(len(drivers), np.inf)
+    timed = ~np.isnan(lap_times)
+    np.minimum.at(best_times, codes[timed], lap_times[timed])
 
-    return gp_data['telemetry_data'], gp_data['lap_data']
+    # Rows that hit their driver's best time carry the lap number to report (ties pick the last occurrence)
+    best_laps = np.zeros(len(drivers), dtype=np.int64)
+    is_best = timed & (lap_times == best_times[codes])
+    best_laps[codes[is_best]] = lap_numbers[is_best]
 
+    return {driver: int(best_laps[i]) for i, driver in enumerate(drivers) if np.isfinite(best_times[i])}
 
-@app.callback(
-    Output('tab-content', 'children'),
-    Input('tabs', 'active_tab'),
-    Input('lap-data', 'data'),
-    State('year', 'value'),
-    State('grand-prix', 'value')
-)
-def render_tab_content(active_tab, laps, year, grand_prix):
+
+def load_session_table(path, columns):
     """
-    Renders the tab selected by the user.
+    Reads one session's parquet file into a dataframe. The file is memory-mapped so the OS page cache can share the
+    bytes across workers, and only the requested columns are read.
     """
 
-    # Default if user's selections are invalid
-    content = "No data; try another selection."
+    table = pq.read_table(path, columns=columns, memory_map=True)
 
-    # Get content for user's selections
-    if active_tab:
-        if active_tab == 'welcome-tab':
-            content = build_welcome_tab()
-        elif year in DROP_DOWN_DATA.keys():
-            if grand_prix in DROP_DOWN_DATA[year].keys():
-                if active_tab == 'tel-tab':
-                    content = build_tel_tab(year, grand_prix)
-                elif (('Race' in laps.keys()) or ('Sprint' in laps.keys())) and (active_tab == 'race-tab'):
-                    content = build_lap_tab(year, grand_prix)
+    return table.to_pandas(self_destruct=True, split_blocks=True)
 
-    return content
 
-
-@app.callback(
-    Output('tel-driver-1', 'options'),
-    Output('tel-driver-1', 'value'),
-    Input('tel-session-1', 'value'),
-    State('year', 'value'),
-    State('grand-prix', 'value'),
-    State('tel-driver-1', 'value')
-)
-def update_drivers_1(session, year, grand_prix, driver):
+def prepare_telemetry(telemetry):
     """
-    Updates the driver list for the selected year, Grand Prix, driver, and session (map view graph 1).
+    Factorizes the driver column so lookups compare small integer codes instead of strings, and indexes the frame
+    by (driver, lap) so a driver/lap combination is a single sorted-index lookup. The columns are kept alongside
+    the index since the plotting code reads them directly, and the stable sort preserves the point order within a
+    lap.
     """
 
-    driver_list, driver_val = get_driver_list(session, year, grand_prix, driver)
+    telemetry['Driver'] = telemetry['Driver'].astype('category')
 
-    return driver_list, driver_val
+    return telemetry.set_index(['Driver', 'LapNumber'], drop=False).sort_index(kind='stable')
 
 
-@app.callback(
-    Output('tel-lap-1', 'options'),
-    Output('tel-lap-1', 'value'),
-    Input('tel-driver-1', 'value'),
-    State('year', 'value'),
-    State('grand-prix', 'value'),
-    State('tel-session-1', 'value'),
-    State('tel-lap-1', 'value')
-)
-def update_laps_1(driver, year, grand_prix, session, lap):
+@functools.lru_cache(maxsize=4)
+def load_legacy_gp_data(year, grand_prix):
     """
-    Updates the lap options for the selected year, Grand Prix, driver, and session (map view graph 1).
+    Loads one grand prix's data from the legacy single-pickle layout, which bundles every session together. Only
+    used as a fallback for grands prix that have not been re-ingested into per-session parquet files.
     """
 
-    lap_options, lap_value = get_laps_list(driver, year, grand_prix, session, lap)
+    with open(os.path.join('data', year, grand_prix.replace(' ', '_') + '.pickle'), 'rb') as handle:
+        gp_data = pickle.loads(handle.read())
 
-    return lap_options, lap_value
+    return gp_data
 
 
-@app.callback(
-    Output('tel-map-1', 'figure'),
-    Input('tel-lap-1', 'value', ),
-    Input('tel-param-1', 'value'),
-    Input('tel-map-1', 'clickData'),
-    State('tel-session-1', 'value'),
-    State('tel-driver-1', 'value'),
-    State('lap-data', 'data'),
-    State('tel-data', 'data')
-)
-def render_map_1(lap, param, click_data, session, driver, laps, telemetry):
+@functools.lru_cache(maxsize=32)
+def load_session_data(year, grand_prix, session):
     """
-    Renders the first map view graph based on the user's selections.
+    Loads (and keeps warm) the laps, telemetry, and fastest laps for a single session. Users interact with one
+    session at a time, so loading per session instead of per grand prix keeps first-paint I/O and per-worker
+    memory to the data actually on screen. Data stored in the per-session parquet layout
+    (data/<year>/<gp>/<session>.<kind>.parquet) is preferred; the legacy single-pickle layout is the fallback.
     """
 
-    if click_data:
-        distance = click_data['points'][0]['meta']
+    gp_folder = os.path.join('data', year, grand_prix.replace(' ', '_'))
+    laps_path = os.path.join(gp_folder, session + '.laps.parquet')
+
+    fastest_laps = None
+    if os.path.isfile(laps_path):
+        laps = load_session_table(laps_path, LAP_COLUMNS)
+        telemetry = load_session_table(os.path.join(gp_folder, session + '.telemetry.parquet'), TELEMETRY_COLUMNS)
     else:
-        distance = None
+        gp_data = load_legacy_gp_data(year, grand_prix)
+        laps = gp_data['lap_data'][session]
+        telemetry = gp_data['telemetry_data'][session]
+        fastest_laps = gp_data.get('fastest_laps', {}).get(session)
 
-    fig = plots.get_map_view(driver, param, lap, laps[session], telemetry[session], session, distance)
+    # Fill in fastest laps for sessions ingested before they were precomputed
+    if fastest_laps is None:
+        fastest_laps = get_fastest_laps(laps)
 
-    return fig
+    return {'laps': laps, 'telemetry': prepare_telemetry(telemetry), 'fastest': fastest_laps}
 
 
 @app.callback(
-    Output('tel-driver-2', 'options'),
-    Output('tel-driver-2', 'value'),
-    Input('tel-session-2', 'value'),
+    Output('tab-content', 'children'),
+    Output('last-rendered', 'data'),
+    Input('tabs', 'active_tab'),
+    Input('grand-prix', 'value'),
     State('year', 'value'),
-    State('grand-prix', 'value'),
-    State('tel-driver-2', 'value')
+    State('last-rendered', 'data')
 )
-def update_drivers_2(session, year, grand_prix, driver):
+def render_tab_content(active_tab, grand_prix, year, last_rendered):
     """
-    Updates the driver list for the selected year, Grand Prix, driver, and session (map view graph 2).
+    Renders the tab selected by the user.
     """
 
-    driver_list, driver_val = get_driver_list(session, year, grand_prix, driver)
-
-    return driver_list, driver_val
+    # Dropdown updates can re-fire this callback without changing the selection (e.g. a year change that keeps
+    # the same GP); skip the rebuild when the rendered selection is unchanged
+    rendered = [active_tab, year, grand_prix]
+    if rendered == last_rendered:
+        raise PreventUpdate
 
+    # Default if user's selections are invalid
+    content = "No data; try another selection."
 
-@app.callback(
-    Output('tel-lap-2', 'options'),
-    Output('tel-lap-2', 'value'),
-    Input('tel-driver-2', 'value'),
+    # Get content for user's selections
+    if active_tab:
+        if active_tab == 'welcome-tab':
+            content = WELCOME_TAB
+        elif (year, grand_prix) in SESSIONS_BY_GP:
+            if active_tab == 'tel-tab':
+                content = build_tel_tab(year, grand_prix)
+            elif HAS_RACE_OR_SPRINT[(year, grand_prix)] and (active_tab == 'race-tab'):
+                content = build_lap_tab(year, grand_prix)
+
+    return content, rendered
+
+
+app.clientside_callback(
+    ClientsideFunction(namespace='dropdowns', function_name='updateDrivers'),
+    Output({'type': 'tel-driver', 'i': MATCH}, 'options'),
+    Output({'type': 'tel-driver', 'i': MATCH}, 'value'),
+    Input({'type': 'tel-session', 'i': MATCH}, 'value'),
+    State('drop-down-store', 'data'),
     State('year', 'value'),
     State('grand-prix', 'value'),
-    State('tel-session-2', 'value'),
-    State('tel-lap-2', 'value')
+    State({'type': 'tel-driver', 'i': MATCH}, 'value')
 )
-def update_laps_2(driver, year, grand_prix, session, lap):
-    """
-    Updates the lap options for the selected year, Grand Prix, driver, and session (map view graph 2).
-    """
 
-    lap_options, lap_value = get_laps_list(driver, year, grand_prix, session, lap)
 
-    return lap_options, lap_value
+app.clientside_callback(
+    ClientsideFunction(namespace='dropdowns', function_name='updateLaps'),
+    Output({'type': 'tel-lap', 'i': MATCH}, 'options'),
+    Output({'type': 'tel-lap', 'i': MATCH}, 'value'),
+    Input({'type': 'tel-driver', 'i': MATCH}, 'value'),
+    State('drop-down-store', 'data'),
+    State('year', 'value'),
+    State('grand-prix', 'value'),
+    State({'type': 'tel-session', 'i': MATCH}, 'value'),
+    State({'type': 'tel-lap', 'i': MATCH}, 'value')
+)
 
 
 @app.callback(
-    Output('tel-map-2', 'figure'),
-    Input('tel-lap-2', 'value', ),
-    Input('tel-param-2', 'value'),
-    Input('tel-map-2', 'clickData'),
-    State('tel-session-2', 'value'),
-    State('tel-driver-2', 'value'),
-    State('lap-data', 'data'),
-    State('tel-data', 'data')
+    Output({'type': 'tel-map', 'i': MATCH}, 'figure'),
+    Input({'type': 'tel-lap', 'i': MATCH}, 'value'),
+    Input({'type': 'tel-param', 'i': MATCH}, 'value'),
+    Input({'type': 'tel-map', 'i': MATCH}, 'clickData'),
+    State({'type': 'tel-session', 'i': MATCH}, 'value'),
+    State({'type': 'tel-driver', 'i': MATCH}, 'value'),
+    State('year', 'value'),
+    State('grand-prix', 'value')
 )
-def render_map_2(lap, param, click_data, session, driver, laps, telemetry):
+def render_map_view(lap, param, click_data, session, driver, year, grand_prix):
     """
-    Renders the second map view graph based on the user's selections.
+    Renders a map view graph based on the user's selections. One callback serves both maps via pattern-matching
+    IDs. Built figures are cached pre-serialized, keyed on the selections.
     """
 
     if click_data:
@@ -561,31 +618,39 @@ def render_map_2(lap, param, click_data, session, driver, laps, telemetry):
     else:
         distance = None
 
-    fig = plots.get_map_view(driver, param, lap, laps[session], telemetry[session], session, distance)
+    cache_key = f'map/{year}/{grand_prix}/{session}/{driver}/{lap}/{param}/{distance}'
+    fig = cache.get(cache_key)
+    if fig is None:
+        fig = to_fig_dict(render_map(lap, param, session, driver, year, grand_prix, distance))
+        cache.set(cache_key, fig)
 
     return fig
 
 
 @app.callback(
     Output('tel-line-graph', 'figure'),
-    Input('tel-lap-1', 'value'),
-    Input('tel-lap-2', 'value'),
-    Input('tel-map-1', 'clickData'),
-    Input('tel-map-2', 'clickData'),
+    Input({'type': 'tel-lap', 'i': ALL}, 'value'),
+    Input({'type': 'tel-map', 'i': ALL}, 'clickData'),
     State('year', 'value'),
-    State('tel-session-1', 'value'),
-    State('tel-driver-1', 'value'),
-    State('tel-session-2', 'value'),
-    State('tel-driver-2', 'value'),
-    State('lap-data', 'data'),
-    State('tel-data', 'data')
+    State('grand-prix', 'value'),
+    State({'type': 'tel-session', 'i': ALL}, 'value'),
+    State({'type': 'tel-driver', 'i': ALL}, 'value')
 )
-def render_tel_line_graph(lap_1, lap_2, click_data_1, click_data_2, year, session_1, driver_1, session_2, driver_2,
-                          laps, telemetry):
+def render_tel_line_graph(lap_values, click_data_values, year, grand_prix, session_values, driver_values):
     """
     Renders the telemetry visualization based on the user's selections.
     """
 
+    plots = get_plots()
+
+    if len(lap_values) < 2:
+        raise PreventUpdate
+
+    lap_1, lap_2 = lap_values
+    click_data_1, click_data_2 = click_data_values
+    session_1, session_2 = session_values
+    driver_1, driver_2 = driver_values
+
     if click_data_1:
         distance_1 = click_data_1['points'][0]['meta']
     else:
@@ -595,17 +660,19 @@ def render_tel_line_graph(lap_1, lap_2, click_data_1, click_data_2, year, sessio
     else:
         distance_2 = None
 
+    cache_key = (f'tel/{year}/{grand_prix}/{session_1}/{driver_1}/{lap_1}/{distance_1}'
+                 f'/{session_2}/{driver_2}/{lap_2}/{distance_2}')
+    cached_fig = cache.get(cache_key)
+    if cached_fig is not None:
+        return cached_fig
+
     try:
-        telemetry_1 = telemetry[session_1][
-            (telemetry[session_1]['Driver'] == driver_1)
-            & (telemetry[session_1]['LapNumber'] == lap_1)
-        ]
-        telemetry_2 = telemetry[session_2][
-            (telemetry[session_2]['Driver'] == driver_2)
-            & (telemetry[session_2]['LapNumber'] == lap_2)
-        ]
-        laps_1 = laps[session_1][laps[session_1]['Driver'] == driver_1]
-        laps_2 = laps[session_2][laps[session_2]['Driver'] == driver_2]
+        session_data_1 = load_session_data(year, grand_prix, session_1)
+        session_data_2 = load_session_data(year, grand_prix, session_2)
+        telemetry_1 = filter_lap_telemetry(session_data_1['telemetry'], driver_1, lap_1)
+        telemetry_2 = filter_lap_telemetry(session_data_2['telemetry'], driver_2, lap_2)
+        fastest_lap_1 = session_data_1['fastest'][driver_1]
+        fastest_lap_2 = session_data_2['fastest'][driver_2]
     except Exception as err:
         fig = plots.get_no_race_data_fig()
         print(f"Tel view has unexpected {err=}, {type(err)=}")
@@ -613,11 +680,12 @@ def render_tel_line_graph(lap_1, lap_2, click_data_1, click_data_2, year, sessio
         if (telemetry_1.shape[0] == 0) or (telemetry_2.shape[0] == 0):
             fig = plots.get_no_race_data_fig()
         else:
-            fastest_lap_1 = int(laps_1.loc[laps_1['LapTime'].idxmin()]['LapNumber'])
-            fastest_lap_2 = int(laps_2.loc[laps_2['LapTime'].idxmin()]['LapNumber'])
             fig = plots.get_tel_view(year, driver_1, driver_2, session_1, session_2, lap_1, lap_2, telemetry_1,
                                      telemetry_2, fastest_lap_1, fastest_lap_2, distance_1, distance_2)
 
+    fig = to_fig_dict(fig)
+    cache.set(cache_key, fig)
+
     return fig
 
 
@@ -627,19 +695,26 @@ def render_tel_line_graph(lap_1, lap_2, click_data_1, click_data_2, year, sessio
     Output('lap-time-viz', 'figure'),
     Input('lap-tab-session', 'value'),
     State('year', 'value'),
-    State('lap-data', 'data')
+    State('grand-prix', 'value')
 )
-def render_lap_tab(session, year, laps):
+def render_lap_tab(session, year, grand_prix):
     """
-    Renders visualizations for lap tab.
+    Renders visualizations for lap tab. Built figures are cached pre-serialized, keyed on the selections.
     """
 
-    laps_session = laps[session]
-    delta_fig = plots.get_delta_viz(year, laps_session)
-    tyre_fig = plots.get_tyre_strategy_viz(laps_session)
-    lap_time_fig = plots.get_lap_time_heatmap(laps_session)
+    cache_key = f'lap-tab/{year}/{grand_prix}/{session}'
+    figs = cache.get(cache_key)
+    if figs is None:
+        plots = get_plots()
+        laps_session = load_session_data(year, grand_prix, session)['laps']
+        figs = (
+            to_fig_dict(plots.get_delta_viz(year, laps_session)),
+            to_fig_dict(plots.get_tyre_strategy_viz(laps_session)),
+            to_fig_dict(plots.get_lap_time_heatmap(laps_session))
+        )
+        cache.set(cache_key, figs)
 
-    return delta_fig, tyre_fig, lap_time_fig
+    return figs
 
 if __name__ == "__main__":
     app.run_server(debug=True)
@@ -0,0 +1,41 @@
+// Clientside callbacks for the year/GP/driver/lap dropdowns. These are plain lookups into the dropdown tree
+// shipped via the drop-down-store, so they run in the browser without a server round-trip.
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dropdowns: {
+        updateGpOptions: function (year, tree, grandPrix) {
+            const gps = (tree || {})[year];
+            if (!gps) {
+                return [[{label: 'No GP Data', value: 'No GP Data'}], 'No GP Data'];
+            }
+            const names = Object.keys(gps);
+            const value = names.includes(grandPrix) ? grandPrix : names[0];
+            return [names.map((x) => ({label: x, value: x})), value];
+        },
+
+        updateDrivers: function (session, tree, year, grandPrix, driver) {
+            let drivers;
+            try {
+                drivers = Object.keys(tree[year][grandPrix][session]);
+            } catch (err) {
+                return [[{label: 'No Driver Data', value: 'No Driver Data'}], 'No Driver Data'];
+            }
+            const value = drivers.includes(driver) ? driver : drivers[0];
+            return [drivers.map((x) => ({label: x, value: x})), value];
+        },
+
+        updateLaps: function (driver, tree, year, grandPrix, session, lap) {
+            let entry;
+            try {
+                entry = tree[year][grandPrix][session][driver];
+            } catch (err) {
+                entry = undefined;
+            }
+            if (!entry || entry.laps.length === 0) {
+                return [[{label: 'No Lap Data', value: 'No Lap Data'}], 'No Lap Data'];
+            }
+            const value = entry.laps.includes(lap) ? lap : entry.minLap;
+            return [entry.laps.map((x) => ({label: x, value: x})), value];
+        }
+    }
+});
@@ -1,45 +1,85 @@
+import concurrent.futures
 import os
 import pickle as pickle
 
 import fastf1 as ff1
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+
+# Telemetry channels all fit comfortably in 32 bits or less, so cast them explicitly at ingest instead of
+# relying on downcasting to discover it. Brake is stored as 0/100 (plotted as a percentage), which fits uint8.
+TELEMETRY_DTYPES = {
+    'Driver': 'category',
+    'X': 'float32',
+    'Y': 'float32',
+    'Speed': 'float32',
+    'nGear': 'int8',
+    'Throttle': 'uint8',
+    'Brake': 'uint8',
+    'Distance': 'float32',
+    'LapNumber': 'int16'
+}
+
+# The telemetry channels kept from FastF1's ~20-column output (the rest of TELEMETRY_DTYPES is added per lap)
+TELEMETRY_CHANNELS = ['X', 'Y', 'Speed', 'nGear', 'Throttle', 'Brake', 'Distance']
 
 
 def downcast_df(df):
     """
-    Reduces the size of a dataframe by downcasting floats and ints as much as possible.
+    Reduces the size of a dataframe by downcasting floats and ints as much as possible. The value ranges are taken
+    from one min/max aggregation over the numeric columns and compared against the finfo/iinfo bounds directly,
+    instead of letting pd.to_numeric rescan each column. Low-cardinality string columns (Driver, Compound, ...)
+    become categoricals, which store int codes plus a small dictionary instead of a Python string per row.
     :param DataFrame df: Dataframe to be downcast
     :return: Downcast dataframe
     """
 
-    for column in df:
-        if df[column].dtype == 'float64':
-            df[column] = pd.to_numeric(df[column], downcast='float')
-        if df[column].dtype == 'int64':
-            df[column] = pd.to_numeric(df[column], downcast='integer')
+    floats = df.select_dtypes(include='float64')
+    if not floats.empty:
+        # Written as a negated comparison so all-NaN columns (NaN max) still downcast
+        fits = ~(floats.abs().max() > np.finfo(np.float32).max)
+        df[fits.index[fits]] = floats.loc[:, fits].astype(np.float32)
+
+    ints = df.select_dtypes(include='int64')
+    if not ints.empty:
+        mins, maxes = ints.min(), ints.max()
+        for column in ints.columns:
+            for dtype in (np.int8, np.int16, np.int32):
+                info = np.iinfo(dtype)
+                if (mins[column] >= info.min) and (maxes[column] <= info.max):
+                    df[column] = ints[column].astype(dtype)
+                    break
+
+    strings = df.select_dtypes(include='object')
+    for column in strings.columns:
+        if strings[column].nunique() < 0.5 * len(df):
+            df[column] = strings[column].astype('category')
 
     return df
 
 
-def get_lap_data(season, gp, session_in, cache_path=None, save_path=None):
+def get_lap_data(season, gp, session_in, cache_path=None, save_path=None, session=None):
     """
     Loads lap data using FastF1. If specified, pickles and saves the data to the specified path.
     :param int season: Season
     :param str gp: Name of the gp, e.g. 'Australian' or 'Bahrain'
     :param str session_in: Session ('Race' or 'Qualifying')
     :param str cache_path: If caching FastF1 API call data (recommended), path to cache. None = do not use cache.
-    :param str save_path: Path to save pickled lap data dataframe (optional).
+    :param str save_path: Path to save lap data dataframe as parquet (optional).
+    :param session: Already-loaded FastF1 session object (optional). Pass one in when also retrieving telemetry so
+        the session is only parsed once.
     :return: DataFrame with processed lap data for the season, grand prix, and session specified by user.
     """
 
-    # Use cached data from API calls (or don't)
-    if cache_path:
-        ff1.Cache.enable_cache(cache_path)
+    if session is None:
+        # Use cached data from API calls (or don't)
+        if cache_path:
+            ff1.Cache.enable_cache(cache_path)
 
-    # Load the session data
-    session = ff1.get_session(season, gp, session_in)
-    session.load()
+        # Load the session data
+        session = ff1.get_session(season, gp, session_in)
+        session.load()
 
     # Get laps data (excl. formation lap)
     laps = session.laps
@@ -47,101 +87,155 @@ def get_lap_data(season, gp, session_in, cache_path=None, save_path=None):
 
     # Add final driver position to laps data (for future processing convenience)
     if session_in == 'Sprint':
-        results = laps.sort_values(by='LapNumber', ascending=False).drop_duplicates(['DriverNumber'])
-        results.sort_values(by=['LapNumber', 'Time'], ascending=[False, True], inplace=True, ignore_index=True)
-        results['Position'] = results.index+1
+        # One idxmax pass picks each driver's last lap; a single sort by laps completed then time gives the
+        # ranking (the old sort/drop_duplicates/sort ran three full-frame sorts)
+        last_laps = laps.loc[laps.groupby('DriverNumber')['LapNumber'].idxmax()]
+        results = last_laps.sort_values(by=['LapNumber', 'Time'], ascending=[False, True], ignore_index=True)
+        results['Position'] = np.arange(1, len(results) + 1, dtype=np.int8)
         results = results[['DriverNumber', 'Position']]
     else:
         results = pd.DataFrame({'DriverNumber': session.results.DriverNumber, 'Position': session.results.Position})
     laps = laps.merge(results, how='left', on='DriverNumber')
 
-    # Get winner's delta to each driver
-    laps_winner = laps.loc[laps['Position'] == 1]
-    laps_winner = laps_winner[['Time', 'LapNumber']]
-    laps_winner.columns = ['WinnerTime', 'LapNumber']
-    laps = laps.merge(laps_winner, how='left', on='LapNumber')
-    laps['DeltaWinner'] = (laps['Time'] - laps['WinnerTime']) / np.timedelta64(1, 's')
-
-    # Identify the pit stops (for future processing convenience)
-    laps.loc[:, 'PitStop'] = ~laps['PitInTime'].isnull()
-
-    # Parse the track status into separate columns (for future processing convenience)
-    laps.loc[:, 'Yellow'] = laps['TrackStatus'].str.contains('2')
-    laps.loc[:, 'Red'] = laps['TrackStatus'].str.contains('5')
-    laps.loc[:, 'Safety'] = laps['TrackStatus'].str.contains('4')
-    laps.loc[:, 'Virtual'] = laps['TrackStatus'].str.contains('6')
-    laps.loc[:, 'Nominal'] = (~laps['Red']) & (~laps['Yellow']) & (~laps['Safety']) & (~laps['Virtual'])
+    # Get winner's delta to each driver. Mapping each lap number onto the winner's times is a single vectorized
+    # gather; the old self-merge hash-joined and copied the whole frame just to subtract two columns.
+    winner_times = laps.loc[laps['Position'] == 1].set_index('LapNumber')['Time']
+    # float32 is plenty for a seconds delta and keeps the column out of downcast_df's scan
+    laps['DeltaWinner'] = (laps['Time'] - laps['LapNumber'].map(winner_times)).dt.total_seconds().astype(np.float32)
+
+    # Identify the pit stops and parse the track status into separate columns (for future processing convenience).
+    # Plain substring matching (regex=False) skips the regex machinery, and assigning all the flag columns in one
+    # pass avoids re-materializing the frame per column.
+    track_status = laps['TrackStatus']
+    yellow = track_status.str.contains('2', regex=False)
+    red = track_status.str.contains('5', regex=False)
+    safety = track_status.str.contains('4', regex=False)
+    virtual = track_status.str.contains('6', regex=False)
+    laps = laps.assign(
+        PitStop=laps['PitInTime'].notna(),
+        Yellow=yellow,
+        Red=red,
+        Safety=safety,
+        Virtual=virtual,
+        Nominal=~(yellow | red | safety | virtual)
+    )
 
     # Store relevant data as a dataframe; downcast ints/floats where possible to reduce size
     laps = laps[['Driver', 'LapNumber', 'LapTime', 'Position', 'DeltaWinner', 'PitInTime', 'PitStop', 'Time', 'Stint',
                  'Compound', 'Yellow', 'Red', 'Safety', 'Virtual', 'Nominal']]
-    laps_df = downcast_df(pd.DataFrame(laps))
+    laps_df = downcast_df(laps)
 
     # Save dataframe if requested
     if save_path is not None:
-        laps_df.to_pickle(save_path)
+        laps_df.to_parquet(save_path, compression='zstd')
 
     return laps_df
 
 
-def get_telemetry_data(season, gp, session, cache_path=None, save_path=None, downsample=1):
+def get_telemetry_data(season, gp, session_in, cache_path=None, save_path=None, downsample=1, session=None):
     """
     Loads telemetry data using FastF1. If specified, pickles and saves the data to the specified path.
     :param int season: Season
     :param str gp: Name of the gp, e.g. 'Australian' or 'Bahrain'
-    :param str session: Session ('Race' or 'Qualifying')
+    :param str session_in: Session ('Race' or 'Qualifying')
     :param str cache_path: If caching FastF1 API call data (recommended), path to cache. None = do not use cache.
-    :param str save_path: Path to save pickled lap data dataframe (optional).
+    :param str save_path: Path to save telemetry dataframe as parquet (optional).
     :param downsample: Factor by which to reduce the telemetry data (optional). E.g. if downsample = 2, every other
         data point will be excluded from the saved file. Used if file size is a concern.
+    :param session: Already-loaded FastF1 session object (optional). Pass one in when also retrieving lap data so
+        the session is only parsed once.
     :return: DataFrame with processed lap data for the season, grand prix, and session specified by user.
     """
 
-    # Use cached data from API calls (or don't)
-    if cache_path:
-        ff1.Cache.enable_cache(cache_path)
+    if session is None:
+        # Use cached data from API calls (or don't)
+        if cache_path:
+            ff1.Cache.enable_cache(cache_path)
 
-    # Load the session data
-    session = ff1.get_session(season, gp, session)
-    session.load()
+        # Load the session data
+        session = ff1.get_session(season, gp, session_in)
+        session.load()
 
     # Get laps data (excl. formation lap)
     laps = session.laps
     laps = laps.loc[laps['LapNumber'] >= 1]
 
-    # Get all drivers
-    drivers = pd.unique(laps['Driver'])
-
     # Retrieve each driver's telemetry, resetting distance to 0 at start of each lap
     # (based on https://medium.com/towards-formula-1-analysis/formula-1-data-analysis-tutorial-2021-russian-gp-to-box-
-    # or-not-to-box-da6399bd4a39)
-    telemetry = pd.DataFrame()
-    for driver in drivers:
-        driver_laps = laps.pick_driver(driver)
+    # or-not-to-box-da6399bd4a39). The car and position channels are merged once per driver and lap numbers are
+    # assigned with one binary search over the sample times; per-lap get_telemetry calls would redo the slice and
+    # merge for every one of the session's ~1000 driver/lap combinations.
+    def fetch_driver_telemetry(driver_group):
+        driver, driver_laps = driver_group
         print("Retrieving telemetry data for " + driver)
 
-        for lap in driver_laps.iterlaps():
-            try:
-                driver_telemetry = lap[1].get_telemetry()
-            except Exception as err:
-                print("Error accessing data; skipping and continuing")
-                pass
-            else:
-                driver_telemetry['Driver'] = driver
-                driver_telemetry['LapNumber'] = lap[1]['LapNumber']
-                driver_telemetry['Compound'] = lap[1]['Compound']
-                driver_telemetry['Brake'] = driver_telemetry['Brake'].astype(int) * 100
-
-                telemetry = telemetry.append(driver_telemetry)
-
-    # Store relevant data as a dataframe; downsample if requested; downcast ints/floats where possible to reduce size
-    telemetry = telemetry[['Driver', 'X', 'Y', 'Speed', 'nGear', 'Throttle', 'Brake', 'Distance', 'LapNumber']]
-    telemetry = telemetry.iloc[::downsample]
-    telemetry_df = downcast_df(pd.DataFrame(telemetry))
+        # Missing channel data is the common failure mode, so check for it up front rather than trapping it as
+        # an exception
+        number = driver_laps['DriverNumber'].iloc[0]
+        if (number not in session.car_data) or (number not in session.pos_data):
+            print("No channel data for " + driver + "; skipping and continuing")
+            return None
+
+        telemetry = session.car_data[number].merge_channels(session.pos_data[number])
+
+        # Cumulative distance over the whole stint; rebased to zero per lap below
+        telemetry = telemetry.add_distance()
+
+        # Each sample belongs to the last lap that started before it. Samples before the first lap or after the
+        # final lap's completion are dropped.
+        lap_starts = driver_laps['LapStartTime'].to_numpy()
+        lap_numbers = driver_laps['LapNumber'].to_numpy()
+        order = np.argsort(lap_starts)
+        lap_starts, lap_numbers = lap_starts[order], lap_numbers[order]
+        sample_times = telemetry['SessionTime'].to_numpy()
+        lap_idx = np.searchsorted(lap_starts, sample_times, side='right') - 1
+
+        keep = lap_idx >= 0
+        session_end = driver_laps['Time'].max()
+        if not pd.isna(session_end):
+            keep &= sample_times <= session_end.to_timedelta64()
+        if not keep.any():
+            return None
+        lap_idx = lap_idx[keep]
+
+        # Cut to the channels that ship before attaching metadata, so the remaining work (and the bytes handed
+        # to Arrow) cover 7 columns instead of everything the merge returns
+        telemetry = telemetry.loc[keep, TELEMETRY_CHANNELS].copy()
+        telemetry['Driver'] = driver
+        telemetry['LapNumber'] = lap_numbers[lap_idx]
+        # Brake is boolean and plotted as 0/100, which fits uint8 directly; casting through int would burn an
+        # int64 column on 1-byte values
+        telemetry['Brake'] = telemetry['Brake'].to_numpy(dtype=np.uint8) * np.uint8(100)
+
+        # Reset the cumulative distance to zero at each lap boundary
+        distance = telemetry['Distance'].to_numpy()
+        starts = np.r_[0, np.flatnonzero(np.diff(lap_idx)) + 1]
+        counts = np.diff(np.r_[starts, len(lap_idx)])
+        telemetry['Distance'] = distance - np.repeat(distance[starts], counts)
+
+        # Arrow tables concatenate chunked columns zero-copy, so the session never sits in memory twice the way
+        # a pandas concat would leave it
+        return pa.RecordBatch.from_pandas(telemetry[list(TELEMETRY_DTYPES)], preserve_index=False)
+
+    # Drivers fetch concurrently: channel merging is I/O- and parse-bound inside FastF1, which releases the GIL
+    # for most of that work. executor.map keeps the driver order deterministic.
+    driver_groups = list(laps.groupby('Driver', sort=False))
+    batches = []
+    if driver_groups:
+        workers = min(8, len(driver_groups))
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+            batches = [batch for batch in executor.map(fetch_driver_telemetry, driver_groups) if batch is not None]
+
+    table = pa.Table.from_batches(batches) if batches else pa.table({col: [] for col in TELEMETRY_DTYPES})
+
+    # Store relevant data as a dataframe; downsample if requested; narrow the dtypes to reduce size.
+    # self_destruct releases each Arrow buffer as its column is handed to pandas.
+    telemetry = table.to_pandas(self_destruct=True, split_blocks=True)
+    telemetry_df = telemetry.iloc[::downsample].astype(TELEMETRY_DTYPES)
 
     # Save dataframe if requested
     if save_path:
-        telemetry_df.to_pickle(save_path)
+        telemetry_df.to_parquet(save_path, compression='zstd')
 
     return telemetry_df
 
@@ -150,6 +244,8 @@ def add_session_to_site_data(season, gp, session, path_to_data, cache_path=None,
     """
     Loads, processes, and stores the specified session's data in the file structure and format needed for the Dash app.
     Overwrites any existing saved data for the specified session (but will not impact saved data for other sessions).
+    Laps and telemetry are written as zstd-compressed parquet files (smaller and faster to load than the legacy
+    per-GP pickle, and the app can read single sessions on demand); drop-down options stay in one small pickle.
     :param int season: Season
     :param str gp: Name of the gp, e.g. 'Australian' or 'Bahrain'
     :param str session: Session ('Race' or 'Qualifying')
@@ -160,19 +256,16 @@ def add_session_to_site_data(season, gp, session, path_to_data, cache_path=None,
         data point will be excluded from the saved file. Used if file size is a concern.
     """
 
-    # Create a folder for the year if it doesn't exist already
-    path_to_year = os.path.join(path_to_data, str(season))
-    if not os.path.exists(path_to_year):
-        os.makedirs(path_to_year)
+    # Normalize the session name once here. The app indexes its stores and drop-down data with the session string
+    # as-is, so keys must match the dropdown values ('Race', 'Qualifying', ...) exactly.
+    session = session.capitalize()
 
-    # Pull in the existing data (if relevant)
-    path_to_gp_data = os.path.join(path_to_year, gp.replace(" ", "_") + '.pickle')
-    if os.path.isfile(path_to_gp_data):
-        with open(path_to_gp_data, 'rb') as handle:
-            gp_data = pickle.load(handle)
-    else:
-        gp_data = {'lap_data': {}, 'telemetry_data': {}}
+    # Create a folder for the grand prix if it doesn't exist already
+    path_to_gp = os.path.join(path_to_data, str(season), gp.replace(" ", "_"))
+    if not os.path.exists(path_to_gp):
+        os.makedirs(path_to_gp)
 
+    # Pull in the existing drop down data (if relevant)
     path_to_drop_down_data = os.path.join(path_to_data, 'drop_down_data.pickle')
     if os.path.isfile(path_to_drop_down_data):
         with open(path_to_drop_down_data, 'rb') as handle:
@@ -180,30 +273,27 @@ def add_session_to_site_data(season, gp, session, path_to_data, cache_path=None,
     else:
         drop_down_data = {}
 
-    # Add (or overwrite) lap and telemetry data for the requested gp and session
-    laps = get_lap_data(season, gp, session, cache_path=cache_path)
-    gp_data['lap_data'][session] = laps
-
-    telemetry = get_telemetry_data(season, gp, session, cache_path=cache_path, downsample=downsample)
-    gp_data['telemetry_data'][session] = telemetry
-
-    # Add (or overwrite) drop down options for the requested gp and session
-    if str(season) not in drop_down_data.keys():
-        drop_down_data[str(season)] = {}
-    if str(gp) not in drop_down_data[str(season)].keys():
-        drop_down_data[str(season)][gp] = {}
-    if session not in drop_down_data[str(season)][gp].keys():
-        drop_down_data[str(season)][gp][session] = {}
-
-    for driver in telemetry['Driver'].unique():
-        drop_down_data[str(season)][gp][session][driver] = telemetry[telemetry['Driver'] == driver][
-            'LapNumber'].unique()
-
-    # Save as pickle
-    with open(path_to_gp_data, 'wb') as handle:
-        pickle.dump(gp_data, handle, protocol=pickle.HIGHEST_PROTOCOL)
+    # Load the FastF1 session once and share it, so the lap and telemetry helpers don't each re-parse it
+    if cache_path:
+        ff1.Cache.enable_cache(cache_path)
+    loaded_session = ff1.get_session(season, gp, session)
+    loaded_session.load()
 
+    # Add (or overwrite) lap and telemetry data for the requested gp and session
+    get_lap_data(season, gp, session, session=loaded_session,
+                 save_path=os.path.join(path_to_gp, session + '.laps.parquet'))
+    telemetry = get_telemetry_data(season, gp, session, session=loaded_session, downsample=downsample,
+                                   save_path=os.path.join(path_to_gp, session + '.telemetry.parquet'))
+
+    # Add (or overwrite) drop down options for the requested gp and session; one groupby pass builds every
+    # driver's lap list instead of re-masking the full telemetry frame per driver
+    per_driver_laps = telemetry.groupby('Driver', sort=False, observed=True)['LapNumber'].unique().to_dict()
+    drop_down_data.setdefault(str(season), {}).setdefault(gp, {})[session] = per_driver_laps
+
+    # Save the drop down options as pickle. Protocol 5 writes large bytes-like objects as single framed
+    # records, which pickles the numpy arrays behind the lap lists a bit faster than the older protocols.
+    # (Out-of-band buffers would need a buffer_callback here and matching buffers on load; we don't use them.)
     with open(path_to_drop_down_data, 'wb') as handle:
-        pickle.dump(drop_down_data, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        pickle.dump(drop_down_data, handle, protocol=5)
 
     return
@@ -1,5 +1,8 @@
+from types import MappingProxyType
+
 import numpy as np
 import pandas as pd
+import plotly.colors
 import plotly.graph_objects as go
 
 # Figure formatting
@@ -122,6 +125,26 @@ PARAM_FORMAT = {
     }
 }
 
+# Normalize the colorscales to explicit (position, color) stops once at import so Plotly's per-trace
+# validation reuses the precomputed form instead of rebuilding it on every figure, and freeze the
+# format dicts since the figure builders only ever read them.
+for _format in PARAM_FORMAT.values():
+    _colorscale = _format['colorscale']
+    if isinstance(_colorscale[0], str):
+        _colorscale = plotly.colors.make_colorscale(_colorscale)
+    plotly.colors.validate_colorscale(_colorscale)
+    _format['colorscale'] = tuple((float(position), color) for position, color in _colorscale)
+PARAM_FORMAT = MappingProxyType({param: MappingProxyType(form) for param, form in PARAM_FORMAT.items()})
+
+# Hovertemplates for the telemetry comparison, assembled once per parameter at import; the figure builder
+# only fills in the driver and session per selection ({{...}} escapes keep plotly's %{x}/%{y} placeholders
+# intact through .format())
+TEL_HOVER_TEMPLATES = {
+    param: ("Driver: {driver}<br /br>Session: {session}<br /br/>Distance: %{{x}}m <br />"
+            + param + ": %{{y}} " + form['hovertemplate_suffix'] + "<extra></extra>")
+    for param, form in PARAM_FORMAT.items()
+}
+
 
 def get_default_fig():
     """
@@ -202,39 +225,37 @@ def get_lap_time_heatmap(laps):
     Creates a heatmap visualization of the grand prix's lap time by driver.
     """
 
-    # Pivot raw data to get a dataframe of Driver x Lap x Lap Time
-    lap_times_pivot = pd.pivot_table(
-        laps[['Driver', 'LapNumber', 'LapTime']],
-        values='LapTime',
-        index=['Driver'],
-        columns=['LapNumber'],
-        aggfunc=np.max,
-        dropna=False
-    )
-    lap_times_pivot.reset_index(inplace=True)
+    # Narrow to the columns this figure reads so the accesses below never touch the rest of the frame
+    laps = laps.loc[:, ['Driver', 'Position', 'LapNumber', 'LapTime', 'PitStop']]
 
-    # Order lap times and drivers by final position (for plotting purposes)
-    position = laps[['Driver', 'Position']].drop_duplicates()
-    lap_times_pivot = lap_times_pivot.merge(position, how='left', on='Driver')
-    lap_times_pivot.sort_values(by='Position', ascending=False, inplace=True, ignore_index=True)
-    drivers = lap_times_pivot['Driver'].unique()
+    # Build the Driver x Lap matrix directly: order drivers by final position, map each lap row to its (driver,
+    # lap) cell, and scatter the times into a preallocated array. This is what the old pivot/merge/sort chain
+    # produced, without pandas materializing three intermediate frames.
+    positions = laps[['Driver', 'Position']].drop_duplicates().set_index('Driver')['Position']
+    drivers = positions.sort_values(ascending=False).index.to_numpy()
     n_drivers = drivers.size
 
-    # Remove columns not needed in plot
-    lap_times_pivot = lap_times_pivot.drop(labels=['Driver', 'Position'], axis=1)
-
-    # Convert to an array in second, with nan where data is missing.
-    # Note: time_pivot is a timedelta64 in ns. NaT converts to a negative number, so we rewrite those as np.nan.
-    lap_times_array = lap_times_pivot.to_numpy(dtype='float64') / 1000000000
+    row_idx = pd.Categorical(laps['Driver'], categories=drivers).codes
+    col_idx = laps['LapNumber'].to_numpy(dtype='int64') - 1
+
+    # Times land in seconds, with nan where data is missing.
+    # Note: LapTime is a timedelta64 in ns. Viewing it as int64 turns the cast into pure integer reinterpretation,
+    # and the divide runs in place on the one float copy. NaT views as INT64_MIN, so it comes out as a large
+    # negative float and is rewritten to np.nan by the mask below.
+    lap_times = laps['LapTime'].to_numpy(dtype='timedelta64[ns]', copy=False).view('int64').astype('float64')
+    np.divide(lap_times, 1e9, out=lap_times)
+    lap_times_array = np.full((n_drivers, col_idx.max() + 1), np.nan)
+    lap_times_array[row_idx, col_idx] = lap_times
     lap_times_array[lap_times_array < 0] = np.nan
 
     # Get the pit stops. Creates an n_driver x n_laps array with asterisks where there are pit stops. This is used to
-    # layer text over the heatmap to represent pit stops.
-    pit_stops = laps.loc[laps['PitStop'], ['LapNumber', 'Position']]
-    pit_stops = pit_stops[pit_stops['LapNumber'].between(1, lap_times_array.shape[1])]
-    pit_stops = pit_stops.astype({'Position': 'int8', 'LapNumber': 'int8'})
-    pit_stops_array = np.empty(lap_times_array.shape, dtype='str')
-    pit_stops_array[n_drivers - pit_stops['Position'].values, pit_stops['LapNumber'].values - 1] = '*'
+    # layer text over the heatmap to represent pit stops. The row/column indices are the same ones used for the
+    # lap-time scatter above, so the fill is a second scatter on flat arrays - no pandas filtering chain.
+    pit_mask = laps['PitStop'].to_numpy(dtype=bool)
+    pit_rows, pit_cols = row_idx[pit_mask], col_idx[pit_mask]
+    in_range = (pit_cols >= 0) & (pit_cols < lap_times_array.shape[1])
+    pit_stops_array = np.full(lap_times_array.shape, '', dtype='<U1')
+    pit_stops_array[pit_rows[in_range], pit_cols[in_range]] = '*'
 
     # Calculate the slowest time to include in the colorbar. This prevents outliers (e.g., safety car laps) from
     # dominating the colorbar and drowning out variation in lap time for other laps
@@ -278,21 +299,35 @@ def get_delta_viz(year, laps):
     Creates a line graph that shows each driver's delta to the winner of the race, by lap.
     """
 
+    # Narrow to the columns this figure reads; the boolean masks and per-driver groups below copy every
+    # column they carry, so dropping the unused ones up front shrinks all of those copies
+    laps = laps.loc[:, ['Driver', 'Position', 'LapNumber', 'DeltaWinner', 'PitStop', 'Nominal',
+                        'Red', 'Yellow', 'Safety', 'Virtual']]
+
     # Get track status relative to winner's lap number
     laps_winner = laps[laps['Position'] == 1]
     track_status = laps_winner[~laps_winner['Nominal']]
 
+    # Aggregations used by several traces and the axis ranges, computed once up front
+    delta_max = float(laps['DeltaWinner'].max())
+    delta_min = float(laps['DeltaWinner'].min())
+    lap_max = int(laps['LapNumber'].max())
+    drivers = sorted(laps['Driver'].unique(), reverse=True)
+
     # Create default figure
     delta_view = get_default_fig()
 
-    # Add background shading for track status
+    # Add background shading for track status, skipping statuses that never occurred — an empty bar
+    # trace still pays full validation and serialization cost
     for status, color in TRACK_STATUS_COLORS.items():
         active_laps = track_status[track_status[status]]
+        if active_laps.empty:
+            continue
         delta_view.add_trace(
             go.Bar(
-                x=active_laps.LapNumber,
-                y=[laps['DeltaWinner'].max()] * active_laps.shape[0],
-                width=[1] * active_laps.shape[0],
+                x=active_laps['LapNumber'].to_numpy(),
+                y=np.full(active_laps.shape[0], delta_max),
+                width=1,
                 marker_color=color,
                 marker_line_width=0,
                 showlegend=False,
@@ -300,42 +335,49 @@ def get_delta_viz(year, laps):
             )
         )
 
+    # Split the laps (and pit laps) per driver in one pass each; masking inside the loop would rescan the full
+    # frame for every driver
+    laps_by_driver = laps.groupby('Driver', sort=False, observed=True)
+    pit_laps = laps[laps['PitStop']]
+    pit_by_driver = pit_laps.groupby('Driver', sort=False, observed=True)
+
     # Add a line for each driver and markers for their pit stops
-    colors_used = []
-    for driver in sorted(laps['Driver'].unique(), reverse=True):
+    colors_used = set()
+    for driver in drivers:
         # Use a dashed line if driver's teammate already appears on graph
         color = DRIVER_COLORS[year][driver]
         if color in colors_used:
             dash_style = 'dash'
         else:
             dash_style = None
-        colors_used.append(color)
+        colors_used.add(color)
 
-        # Get driver's data
-        laps_driver = laps[laps['Driver'] == driver]
+        # Get driver's data as flat arrays; the trace is assembled from ndarrays and a scalar meta (one copy of
+        # the driver name instead of a column of it in the serialized payload)
+        laps_driver = laps_by_driver.get_group(driver)
 
-        # Add the line
+        # Add the line (Scattergl renders through WebGL instead of building an SVG node per point)
         delta_view.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 legendgroup=driver,
                 name=driver,
-                x=laps_driver['LapNumber'],
-                y=laps_driver['DeltaWinner'],
-                meta=laps_driver.Driver,
+                x=laps_driver['LapNumber'].to_numpy(),
+                y=laps_driver['DeltaWinner'].to_numpy(),
+                meta=driver,
                 hovertemplate="Driver: %{meta} <br /br>Lap: %{x} <br />Delta: %{y}s<extra></extra>",
                 line=dict(color=color, dash=dash_style)
             )
         )
 
         # Add markers for pit stops
-        pit_driver = laps_driver[laps_driver['PitStop']]
+        pit_driver = pit_by_driver.get_group(driver) if driver in pit_by_driver.groups else pit_laps.iloc[:0]
         delta_view.add_trace(
-            go.Scatter(
+            go.Scattergl(
                 legendgroup=driver,
                 name=driver,
-                x=pit_driver['LapNumber'],
-                y=pit_driver['DeltaWinner'],
-                meta=pit_driver.Driver,
+                x=pit_driver['LapNumber'].to_numpy(),
+                y=pit_driver['DeltaWinner'].to_numpy(),
+                meta=driver,
                 hovertemplate="Driver: %{meta} <br /br>Lap: %{x} <br />Delta to Winner: %{y}<extra></extra> <br />Pit",
                 mode='markers',
                 marker=dict(color=color, size=MARKER_SIZE * 1.5),
@@ -345,14 +387,14 @@ def get_delta_viz(year, laps):
 
     # Update formatting
     delta_view.update_xaxes(
-        range=[0, laps['LapNumber'].max() + 1],
+        range=[0, lap_max + 1],
         gridwidth=GRID_WIDTH,
         gridcolor=GRID_COLOR,
         title_text='Lap'
     )
 
     delta_view.update_yaxes(
-        range=[min(MIN_GAP, laps['DeltaWinner'].max()), max(MAX_GAP, laps['DeltaWinner'].min() - 5)],
+        range=[min(MIN_GAP, delta_max), max(MAX_GAP, delta_min - 5)],
         gridwidth=GRID_WIDTH,
         gridcolor=GRID_COLOR,
         showline=False,
@@ -374,42 +416,37 @@ def get_tyre_strategy_viz(laps):
     Returns a horizontal stacked bar chart showing the tyres used by each driver over the course of the race.
     """
 
-    # Get the stints and their length for each driver in order of final position
-    laps = laps[['Driver', 'Stint', 'Position', 'LapNumber', 'Compound']]
-    agg_funcs = {
-        'LapNumber': ['max', 'min'],
-        'Compound': ['first']
-    }
-    stints = laps.groupby(by=['Driver', 'Stint', 'Position'], as_index=False).agg(agg_funcs)
-    stints.columns = ['_'.join(col).rstrip('_') for col in stints.columns.values]
-    stints.rename(
-        columns={
-            'Compound_first': 'Compound',
-            'LapNumber_min': 'StintStart',
-            'LapNumber_max': 'StintEnd'
-        },
-        inplace=True
+    # Get the stints and their length for each driver in order of final position. Named aggregation yields flat
+    # columns directly (no MultiIndex flatten/rename step), sort=False skips the groupby-key sort that the
+    # explicit sort_values below would discard, and observed=True keeps categorical driver columns from expanding
+    # to every driver/stint combination.
+    laps = laps.loc[:, ['Driver', 'Stint', 'Position', 'LapNumber', 'Compound']]
+    stints = laps.groupby(by=['Driver', 'Stint', 'Position'], as_index=False, sort=False, observed=True).agg(
+        StintEnd=('LapNumber', 'max'),
+        StintStart=('LapNumber', 'min'),
+        Compound=('Compound', 'first')
     )
     stints['StintLength'] = stints['StintEnd'] - stints['StintStart'] + 1
     stints['Compound'] = stints['Compound'].str.lower()
     stints.sort_values(by=['Position', 'Stint'], ascending=[False, True], inplace=True)
 
-    # Map compound to a colormap for plotting. Note: Random numbers added to avoid having the stacked bar chart group
-    # all compounds of the same type.
+    # Map compound to a colormap for plotting. Note: Small offsets added to avoid having the stacked bar chart group
+    # all compounds of the same type. The offsets are deterministic (unlike the random jitter they replace) so the
+    # same laps always produce the same figure and cached copies stay valid.
     stints['PlotColor'] = 0
     stints.loc[stints['Compound'] == 'medium', 'PlotColor'] = 0.5
     stints.loc[stints['Compound'] == 'hard', 'PlotColor'] = 1
-    stints['PlotColor'] = stints['PlotColor'] + np.random.rand(stints.shape[0]) / 100
+    stints['PlotColor'] = stints['PlotColor'] + (np.arange(stints.shape[0]) % 7) * 1e-4
 
     # Build the graph and adjust layout
     tyre_strategy_view = get_default_fig()
 
     tyre_strategy_view.add_trace(
         go.Bar(
-            x=stints.StintLength,
-            y=stints.Driver,
-            meta=stints.Compound,
-            marker_color=stints.PlotColor,
+            x=stints['StintLength'].to_numpy(),
+            y=stints['Driver'].to_numpy(),
+            meta=stints['Compound'].to_numpy(),
+            marker_color=stints['PlotColor'].to_numpy(),
             marker_colorscale=COMPOUND_COLORS,
             marker_line_color=BG_COLOR,
             marker_colorbar_title="Tyre",
@@ -436,81 +473,87 @@ def get_tyre_strategy_viz(laps):
     return tyre_strategy_view
 
 
-def get_map_view(driver, map_view_param, lap_num, laps, telemetry, session, distance):
+def get_map_view(driver, map_view_param, lap_num, telemetry_driver_lap, session, distance, fastest_lap_num):
     """
-    Returns telemetry data on a map view for on the user's selections
+    Returns telemetry data on a map view for on the user's selections. Expects telemetry already sliced down to the
+    selected driver and lap.
     """
 
-    # Create map view; return "no race data graph" if there is no data for user's selections (just in case)
-    try:
-        telemetry_driver = telemetry[telemetry['Driver'] == driver]
-        laps_driver = laps[laps['Driver'] == driver]
-    except Exception as err:
+    # Return "no race data graph" if there is no data for user's selections (just in case)
+    if telemetry_driver_lap is None or telemetry_driver_lap.shape[0] == 0:
         map_view = get_no_race_data_fig()
-        print(f"Map view 1 has unexpected {err=}, {type(err)=}")
     else:
-        if telemetry_driver[telemetry_driver['LapNumber'] == lap_num].shape[0] == 0:
-            map_view = get_no_race_data_fig()
-        else:
-            fastest_lap_num = int(laps_driver.loc[laps_driver['LapTime'].idxmin()]['LapNumber'])
-            telemetry_driver_lap = telemetry_driver[telemetry_driver['LapNumber'] == lap_num]
-
-            map_view = get_default_fig()
+        map_view = get_default_fig()
+
+        # Narrow the lap slice to the plotted channels before pulling arrays out of it
+        telemetry_driver_lap = telemetry_driver_lap.loc[:, ['X', 'Y', 'Distance', PARAM_FORMAT[map_view_param]['name']]]
+
+        # Hand the traces plain ndarrays; Series go through plotly's pandas conversion on every build.
+        # float32 is plenty for track coordinates and channel values and halves the payload when the
+        # data came from the legacy float64 pickles (the parquet channels are float32 already, so
+        # copy=False makes these conversions free there).
+        map_view.add_scatter(
+            x=telemetry_driver_lap['X'].to_numpy(dtype=np.float32, copy=False),
+            y=telemetry_driver_lap['Y'].to_numpy(dtype=np.float32, copy=False),
+            meta=telemetry_driver_lap['Distance'].to_numpy(dtype=np.float32, copy=False),
+            mode='markers',
+            marker_color=telemetry_driver_lap[PARAM_FORMAT[map_view_param]['name']].to_numpy(dtype=np.float32,
+                                                                                             copy=False),
+            marker_colorscale=PARAM_FORMAT[map_view_param]['colorscale'],
+            marker_cmax=PARAM_FORMAT[map_view_param]['cmax'],
+            marker_cmin=PARAM_FORMAT[map_view_param]['cmin'],
+            marker_colorbar_title=PARAM_FORMAT[map_view_param]['colorbar_title'],
+            marker_showscale=True,
+            marker_size=MARKER_SIZE,
+            hovertemplate=PARAM_FORMAT[map_view_param]['hovertemplate_prefix'] + '%{marker.color}<extra></extra>' +
+                          PARAM_FORMAT[map_view_param]['hovertemplate_suffix'],
+            showlegend=False
+        )
 
+        # If the user selects a point on the map (or there is a pre-existing selection), make it white.
+        # Note: This searches for the closest point in the current driver's telemetry because the selection may
+        #   carry over from a different configuration for this map (e.g., a different lap than the current one).
+        if distance:
+            # Distance increases monotonically within a lap, so the closest sample is found by binary search
+            # (searchsorted gives the right-hand neighbour; step back when the left one is closer)
+            dist = telemetry_driver_lap['Distance'].to_numpy()
+            closest_point = np.searchsorted(dist, distance)
+            if closest_point == dist.size or (
+                    closest_point > 0 and distance - dist[closest_point - 1] < dist[closest_point] - distance):
+                closest_point -= 1
+
+            # Index the column arrays directly; .iloc would materialize the whole row as a Series per column
             map_view.add_scatter(
-                x=telemetry_driver_lap.X,
-                y=telemetry_driver_lap.Y,
-                meta=telemetry_driver_lap.Distance,
+                x=[telemetry_driver_lap['X'].to_numpy()[closest_point]],
+                y=[telemetry_driver_lap['Y'].to_numpy()[closest_point]],
+                meta=[dist[closest_point]],
                 mode='markers',
-                marker_color=telemetry_driver_lap[PARAM_FORMAT[map_view_param]['name']],
-                marker_colorscale=PARAM_FORMAT[map_view_param]['colorscale'],
-                marker_cmax=PARAM_FORMAT[map_view_param]['cmax'],
-                marker_cmin=PARAM_FORMAT[map_view_param]['cmin'],
-                marker_colorbar_title=PARAM_FORMAT[map_view_param]['colorbar_title'],
-                marker_showscale=True,
-                marker_size=MARKER_SIZE,
-                hovertemplate=PARAM_FORMAT[map_view_param]['hovertemplate_prefix'] + '%{marker.color}<extra></extra>' +
-                              PARAM_FORMAT[map_view_param]['hovertemplate_suffix'],
-                showlegend=False
+                marker_color=TRACK_COLOR,
+                marker_size=MARKER_SIZE * 2,
+                showlegend=False,
+                hoverinfo='skip'
             )
 
-            # If the user selects a point on the map (or there is a pre-existing selection), make it white.
-            # Note: This searches for the closest point in the current driver's telemetry because the selection may
-            #   carry over from a different configuration for this map (e.g., a different lap than the current one).
-            if distance:
-                closest_point = np.argmin(np.abs(telemetry_driver_lap.Distance.values - distance))
-
-                map_view.add_scatter(
-                    x=[telemetry_driver_lap.iloc[closest_point]['X']],
-                    y=[telemetry_driver_lap.iloc[closest_point]['Y']],
-                    meta=[telemetry_driver_lap.iloc[closest_point]['Distance']],
-                    mode='markers',
-                    marker_color=TRACK_COLOR,
-                    marker_size=MARKER_SIZE * 2,
-                    showlegend=False,
-                    hoverinfo='skip'
-                )
-
-            map_view.update_xaxes(
-                showgrid=False,
-                showline=False,
-                zeroline=False,
-                showticklabels=False
-            )
+        map_view.update_xaxes(
+            showgrid=False,
+            showline=False,
+            zeroline=False,
+            showticklabels=False
+        )
 
-            map_view.update_yaxes(
-                scaleanchor="x",
-                scaleratio=1,
-                showgrid=False,
-                showline=False,
-                zeroline=False,
-                showticklabels=False
-            )
+        map_view.update_yaxes(
+            scaleanchor="x",
+            scaleratio=1,
+            showgrid=False,
+            showline=False,
+            zeroline=False,
+            showticklabels=False
+        )
 
-            map_view.update_layout(
-                title_text=driver + " " + session + " Lap " + str(lap_num) + " (Fastest Lap = " + str(
-                    fastest_lap_num) + ")"
-            )
+        map_view.update_layout(
+            title_text=driver + " " + session + " Lap " + str(lap_num) + " (Fastest Lap = " + str(
+                fastest_lap_num) + ")"
+        )
 
     return map_view
 
@@ -560,6 +603,12 @@ def get_tel_view(year, driver_1, driver_2, session_1, session_2, lap_num_1, lap_
 
     # Add each driver's data
     for selection in selections.values():
+        # Pull the distance column out as a plain ndarray once; it is shared by all four traces and
+        # skips plotly's per-trace pandas conversion. The trace name only depends on the selection,
+        # so build it once here instead of per parameter.
+        distance_values = selection['Telemetry']['Distance'].to_numpy()
+        trace_name = selection['Driver'] + " " + selection['Session'] + " Lap " + str(
+            selection['Lap']) + " (Fastest Lap = " + str(selection['Fastest Lap']) + ")"
         i = 0
         for param, form in PARAM_FORMAT.items():
             i += 1
@@ -567,15 +616,14 @@ def get_tel_view(year, driver_1, driver_2, session_1, session_2, lap_num_1, lap_
                 showlegend = True
             else:
                 showlegend = False
+            # Scattergl keeps the ~1500-point-per-lap traces on the GPU instead of as SVG paths
             tel_view.add_trace(
-                go.Scatter(
-                    name=selection['Driver'] + " " + selection['Session'] + " Lap " + str(
-                        selection['Lap']) + " (Fastest Lap = " + str(selection['Fastest Lap']) + ")",
-                    x=selection['Telemetry']['Distance'],
-                    y=selection['Telemetry'][form['name']],
-                    hovertemplate="Driver: " + selection['Driver'] + "<br /br>Session: " + selection[
-                        'Session'] + "<br /br/>Distance: %{x}m <br />" + param + ": %{y} " + form[
-                                      'hovertemplate_suffix'] + "<extra></extra>",
+                go.Scattergl(
+                    name=trace_name,
+                    x=distance_values,
+                    y=selection['Telemetry'][form['name']].to_numpy(),
+                    hovertemplate=TEL_HOVER_TEMPLATES[param].format(
+                        driver=selection['Driver'], session=selection['Session']),
                     line_color=selection['Color'],
                     line_width=LINE_WIDTH,
                     showlegend=showlegend
@@ -587,7 +635,7 @@ def get_tel_view(year, driver_1, driver_2, session_1, session_2, lap_num_1, lap_
             # Add vertical line for distance selected on this driver's map (if applicable)
             if selection['Distance']:
                 tel_view.add_trace(
-                    go.Scatter(
+                    go.Scattergl(
                         x=[selection['Distance'], selection['Distance']],
                         y=[-1000, 1000],
                         mode='lines',